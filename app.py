@@ -1,35 +1,65 @@
 import re
 import json
+import math
 import os
-import requests
-import nltk
 import spacy
 from flask import Flask, request, render_template, jsonify
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
 from sklearn.naive_bayes import MultinomialNB
 from dotenv import load_dotenv
-import wikipedia
-from newsapi import NewsApiClient
 from datetime import datetime
 import random
+from pathlib import Path
+from config import Config
+from jobs import JobQueue, QueueFull, InvalidCallbackUrl
+from providers import (
+    get_provider, load_backend,
+    ProviderError, ProviderNotConfigured, ProviderNotFound, AmbiguousQuery
+)
 
 # Load environment variables
 load_dotenv()
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+def spacy_exclusions(model):
+    """Return the components of a spaCy model that entity extraction does not need
+
+    Everything except NER is excluded, apart from a shared embedding layer
+    (tok2vec/transformer) that NER listens to, which it cannot run without.
+    """
+    if spacy.util.is_package(model):
+        package_path = spacy.util.get_package_path(model)
+        meta = spacy.util.get_model_meta(package_path)
+        model_path = package_path / f"{meta['lang']}_{meta['name']}-{meta['version']}"
+    elif Path(model).exists():
+        model_path = Path(model)
+        meta = spacy.util.get_model_meta(model_path)
+    else:
+        raise OSError(f"Can't find spaCy model '{model}'")
+    config = spacy.util.load_config(model_path / 'config.cfg', interpolate=False)
 
-# Load spaCy model
+    keep = {'ner'}
+    ner_tok2vec = config['components'].get('ner', {}).get('model', {}).get('tok2vec', {})
+    if 'Listener' in ner_tok2vec.get('@architectures', ''):
+        upstream = ner_tok2vec.get('upstream', '*')
+        keep.update(
+            name for name, component in config['components'].items()
+            if name == upstream or (upstream == '*' and component.get('factory') in ('tok2vec', 'transformer'))
+        )
+
+    components = meta.get('components') or meta.get('pipeline', [])
+    return [name for name in components if name not in keep]
+
+# Load spaCy model (trimmed to NER unless SPACY_TRIM_PIPELINE=false)
+exclude = []
+if Config.SPACY_TRIM_PIPELINE:
+    try:
+        exclude = spacy_exclusions(Config.SPACY_MODEL)
+    except Exception as e:
+        # Trimming is only an optimisation; load the full pipeline instead
+        print(f"Could not trim the spaCy pipeline ({e}); loading it untrimmed")
 try:
-    nlp = spacy.load("en_core_web_sm")
+    nlp = spacy.load(Config.SPACY_MODEL, exclude=exclude)
 except OSError:
     print("spaCy model not found. Please run: python -m spacy download en_core_web_sm")
     nlp = None
@@ -187,93 +217,66 @@ class EnhancedChatbot:
         return entities
     
     def get_weather(self, city):
-        """Get weather information using OpenWeatherMap API"""
-        api_key = os.getenv('OPENWEATHER_API_KEY')
-        
-        if not api_key:
-            return "Weather API key not configured. Please set OPENWEATHER_API_KEY in your environment variables."
-        
+        """Get weather information from the registered weather provider"""
         if not city:
             return "Please specify a location for the weather query."
         
-        url = f'https://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric'
-        
         try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get("cod") == "404":
-                return f"Sorry, I couldn't find weather information for '{city}'. Please check the spelling."
-            
-            description = data['weather'][0]['description']
-            temp = data['main']['temp']
-            feels_like = data['main']['feels_like']
-            humidity = data['main']['humidity']
-            wind_speed = data['wind']['speed']
-            city_name = data['name']
-            
-            return (
-                f"🌤️ Weather in {city_name}:\n"
-                f"• Condition: {description.title()}\n"
-                f"• Temperature: {temp}°C (feels like {feels_like}°C)\n"
-                f"• Humidity: {humidity}%\n"
-                f"• Wind Speed: {wind_speed} m/s"
-            )
-            
-        except Exception as e:
+            data = get_provider('weather').call(city=city)
+        except ProviderNotConfigured:
+            return "Weather API key not configured. Please set OPENWEATHER_API_KEY in your environment variables."
+        except ProviderNotFound:
+            return f"Sorry, I couldn't find weather information for '{city}'. Please check the spelling."
+        except ProviderError:
             return f"Sorry, I couldn't fetch weather data for {city}. Please try again later."
+        
+        return (
+            f"🌤️ Weather in {data['city_name']}:\n"
+            f"• Condition: {data['description'].title()}\n"
+            f"• Temperature: {data['temp']}°C (feels like {data['feels_like']}°C)\n"
+            f"• Humidity: {data['humidity']}%\n"
+            f"• Wind Speed: {data['wind_speed']} m/s"
+        )
     
     def get_news(self, category='general', country='us'):
-        """Get latest news using NewsAPI"""
-        api_key = os.getenv('NEWS_API_KEY')
-        
-        if not api_key:
-            return "News API key not configured. Please set NEWS_API_KEY in your environment variables."
-        
+        """Get latest news from the registered news provider"""
         try:
-            newsapi = NewsApiClient(api_key=api_key)
-            top_headlines = newsapi.get_top_headlines(category=category, country=country, page_size=5)
-            
-            if not top_headlines['articles']:
-                return "Sorry, I couldn't fetch the latest news right now."
-            
-            news_text = "📰 Latest Headlines:\n\n"
-            for i, article in enumerate(top_headlines['articles'], 1):
-                title = article['title']
-                source = article['source']['name']
-                news_text += f"{i}. {title}\n   Source: {source}\n\n"
-            
-            return news_text
-            
-        except Exception as e:
+            articles = get_provider('news').call(category=category, country=country)
+        except ProviderNotConfigured:
+            return "News API key not configured. Please set NEWS_API_KEY in your environment variables."
+        except ProviderError:
             return "Sorry, I couldn't fetch the latest news right now. Please try again later."
+        
+        if not articles:
+            return "Sorry, I couldn't fetch the latest news right now."
+        
+        news_text = "📰 Latest Headlines:\n\n"
+        for i, article in enumerate(articles, 1):
+            news_text += f"{i}. {article['title']}\n   Source: {article['source']}\n\n"
+        
+        return news_text
     
     def search_wikipedia(self, query):
-        """Search for information using Wikipedia API"""
+        """Search for information using the registered search provider"""
         try:
-            # Search for the topic
-            search_results = wikipedia.search(query, results=3)
-            
-            if not search_results:
-                return f"Sorry, I couldn't find information about '{query}'."
-            
-            # Get the summary of the first result
-            page = wikipedia.page(search_results[0])
-            summary = wikipedia.summary(search_results[0], sentences=3)
-            
-            return f"📚 Information about {query}:\n\n{summary}\n\nSource: Wikipedia"
-            
-        except wikipedia.exceptions.DisambiguationError as e:
+            provider = get_provider('search')
+            summary = provider.call(query=query)
+        except AmbiguousQuery:
             return f"Multiple results found for '{query}'. Please be more specific."
-        except wikipedia.exceptions.PageError:
+        except ProviderNotFound:
             return f"Sorry, I couldn't find information about '{query}'."
-        except Exception as e:
+        except ProviderError:
             return f"Sorry, I couldn't search for '{query}' right now."
+        
+        return f"📚 Information about {query}:\n\n{summary}\n\nSource: {provider.source}"
     
     def generate_response(self, user_input):
         """Generate response based on intent and entities"""
         intent = self.classify_intent(user_input.lower())
+        return self.respond(intent, user_input)
+    
+    def respond(self, intent, user_input):
+        """Generate the response for an already classified intent"""
         entities = self.extract_entities(user_input)
         
         # Find the intent data
@@ -315,12 +318,34 @@ class EnhancedChatbot:
         else:
             return "I'm sorry, I didn't understand that. You can ask me about weather, news, search for information, or just say hi!"
 
+# Register external data providers (PROVIDER_BACKEND selects live APIs or stubs)
+load_backend()
+
 # Initialize chatbot
 chatbot = EnhancedChatbot()
 
+# Job queue for slow intents requested with /chat?async=1
+job_queue = JobQueue(
+    Config.JOB_DB_PATH,
+    chatbot.respond,
+    workers=Config.JOB_WORKERS,
+    max_queued=Config.JOB_QUEUE_MAX,
+    ttl_seconds=Config.JOB_TTL_SECONDS,
+    lease_seconds=Config.JOB_LEASE_SECONDS,
+    webhook_timeout=Config.JOB_WEBHOOK_TIMEOUT,
+    webhooks_enabled=Config.JOB_WEBHOOKS_ENABLED,
+    webhook_allowed_hosts=Config.JOB_WEBHOOK_ALLOWED_HOSTS
+)
+
 # Flask app
 app = Flask(__name__)
 
+@app.before_request
+def start_job_queue():
+    # Start job workers with the first request so jobs left by a restart
+    # (or by another process sharing the database) are picked up
+    job_queue.start()
+
 @app.route("/")
 def home():
     return render_template("index.html")
@@ -334,11 +359,36 @@ def chat():
         if not user_input.strip():
             return jsonify({'response': 'Please enter a message.'})
         
+        if request.args.get('async') == '1':
+            intent = chatbot.classify_intent(user_input.lower())
+            if intent in Config.ASYNC_INTENTS:
+                job_id = job_queue.submit(intent, user_input, callback_url=data.get('callback_url'))
+                return jsonify({'job_id': job_id, 'status': 'queued'}), 202
+            return jsonify({'response': chatbot.respond(intent, user_input)})
+        
         bot_response = chatbot.generate_response(user_input)
         return jsonify({'response': bot_response})
         
+    except InvalidCallbackUrl as e:
+        return jsonify({'response': f'Invalid callback_url: {e}'}), 400
+    except QueueFull:
+        return jsonify({'response': 'I\'m a bit busy right now. Please try again in a moment.'}), 503
     except Exception as e:
         return jsonify({'response': 'Sorry, something went wrong. Please try again.'})
 
+@app.route("/jobs/<job_id>")
+def get_job(job_id):
+    try:
+        wait = float(request.args.get('wait', 0))
+    except ValueError:
+        wait = 0
+    if not math.isfinite(wait):
+        wait = 0
+    
+    job = job_queue.get(job_id, wait=min(max(wait, 0), Config.JOB_POLL_MAX_WAIT))
+    if job is None:
+        return jsonify({'job_id': job_id, 'status': 'not_found'}), 404
+    return jsonify(job)
+
 if __name__ == "__main__":
     app.run(debug=True, host='0.0.0.0', port=8080)
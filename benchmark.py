@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the /chat endpoint
+Drives the full /chat path with a fixed message mix. By default the app
+runs in-process against stub providers, so results are reproducible on a
+machine without network.
+
+    python benchmark.py --backend stub --requests 500 --concurrency 8 --latency-ms 200
+    python benchmark.py --url http://localhost:8080   # benchmark a running server
+
+--mode job sends /chat?async=1 and polls /jobs/<id>; --mode compare runs
+synchronous and job mode back to back under the same stub settings.
+--http-workers caps in-flight requests to the in-process app, standing in
+for a fixed pool of server workers; the job worker pool defaults to the
+same size so both modes get the same concurrency.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Message mix covering every provider plus the local intents
+BENCHMARK_MESSAGES = [
+    "weather in London",
+    "latest news",
+    "tell me about Python programming",
+    "hello",
+    "tell me a joke",
+]
+
+# Messages answered without a provider call, reported separately
+FAST_MESSAGES = {"hello", "tell me a joke"}
+
+
+def percentile(values, fraction):
+    """Return the value at a fraction (0-1) of the sorted values"""
+    ordered = sorted(values)
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def configure_stubs(args):
+    """Export stub and job settings so Config picks them up when the app is imported"""
+    os.environ['PROVIDER_BACKEND'] = args.backend
+    os.environ['STUB_LATENCY_MS'] = str(args.latency_ms)
+    os.environ['STUB_JITTER_MS'] = str(args.jitter_ms)
+    os.environ['STUB_LATENCY_DISTRIBUTION'] = args.distribution
+    os.environ['STUB_ERROR_RATE'] = str(args.error_rate)
+    os.environ['STUB_SEED'] = str(args.seed)
+    os.environ['JOB_WORKERS'] = str(args.job_workers)
+    os.environ['JOB_DB_PATH'] = os.path.join(tempfile.mkdtemp(prefix='chatbot-bench-'), 'jobs.db')
+
+
+def make_transport(url, http_workers):
+    """Return a function (method, path, payload) -> JSON reply for the app under test"""
+    if url:
+        import requests
+        session = threading.local()
+
+        def transport(method, path, payload=None):
+            if not hasattr(session, 'client'):
+                session.client = requests.Session()
+            response = session.client.request(method, f"{url.rstrip('/')}{path}", json=payload, timeout=60)
+            return response.json()
+        return transport
+
+    from app import app
+    clients = threading.local()
+    workers = threading.BoundedSemaphore(http_workers) if http_workers else None
+
+    def transport(method, path, payload=None):
+        if not hasattr(clients, 'client'):
+            clients.client = app.test_client()
+        if workers is None:
+            return clients.client.open(path, method=method, json=payload).get_json()
+        with workers:
+            return clients.client.open(path, method=method, json=payload).get_json()
+    return transport
+
+
+def make_sender(transport, mode, poll_wait, poll_interval):
+    """Return a function that sends one message and returns (reply text, accept latency)"""
+    if mode == 'sync':
+        def send(message):
+            start = time.perf_counter()
+            reply = transport('POST', '/chat', {'message': message})
+            return reply['response'], time.perf_counter() - start
+        return send
+
+    def send(message):
+        start = time.perf_counter()
+        reply = transport('POST', '/chat?async=1', {'message': message})
+        accepted = time.perf_counter() - start
+        if 'job_id' not in reply:
+            return reply['response'], accepted
+        while True:
+            job = transport('GET', f"/jobs/{reply['job_id']}?wait={poll_wait}")
+            if job['status'] in ('done', 'failed', 'not_found'):
+                return job.get('response', ''), accepted
+            if not poll_wait:
+                time.sleep(poll_interval)
+    return send
+
+
+def run_benchmark(send, num_requests, concurrency):
+    """Send num_requests messages with the given concurrency and return the results"""
+    def timed(i):
+        start = time.perf_counter()
+        message = BENCHMARK_MESSAGES[i % len(BENCHMARK_MESSAGES)]
+        response, accepted = send(message)
+        return time.perf_counter() - start, accepted, response, message
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed, range(num_requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for latency, _, _, _ in results]
+    accept_latencies = [accepted for _, accepted, _, _ in results]
+    fast_latencies = [latency for latency, _, _, message in results if message in FAST_MESSAGES] or [0]
+    failures = sum(1 for _, _, response, _ in results if response.startswith('Sorry'))
+    return {
+        'requests': num_requests,
+        'concurrency': concurrency,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(num_requests / elapsed, 2),
+        'latency_mean_ms': round(statistics.mean(latencies) * 1000, 2),
+        'latency_p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'latency_p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'latency_p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'accept_p50_ms': round(percentile(accept_latencies, 0.50) * 1000, 2),
+        'accept_p95_ms': round(percentile(accept_latencies, 0.95) * 1000, 2),
+        'fast_intent_p95_ms': round(percentile(fast_latencies, 0.95) * 1000, 2),
+        'failed_responses': failures,
+    }
+
+
+def print_results(runs):
+    """Print benchmark results side by side, one column per mode"""
+    print("=" * 50)
+    print("⏱️  /chat Benchmark")
+    print("=" * 50)
+    print(f"  {'':<20}" + "".join(f"{run['mode']:>14}" for run in runs))
+    for key in runs[0]:
+        if key != 'mode':
+            print(f"  {key:<20}" + "".join(f"{str(run[key]):>14}" for run in runs))
+
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description="Benchmark the /chat endpoint")
+    parser.add_argument('--backend', choices=['stub', 'http-stub', 'live'], default='stub',
+                        help="provider backend for the in-process app (ignored with --url)")
+    parser.add_argument('--url', default='', help="benchmark a running server instead of an in-process app")
+    parser.add_argument('--mode', choices=['sync', 'job', 'compare'], default='sync',
+                        help="plain /chat, /chat?async=1 with polling, or both")
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency-ms', type=float, default=50)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--distribution', choices=['fixed', 'uniform', 'normal', 'exponential'], default='fixed')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--http-workers', type=int, default=4,
+                        help="in-flight request limit for the in-process app (0 for unlimited)")
+    parser.add_argument('--job-workers', type=int, default=None,
+                        help="job worker threads (defaults to --http-workers, or 4 if that is 0)")
+    parser.add_argument('--poll-wait', type=float, default=0,
+                        help="long-poll wait passed to /jobs/<id> (0 polls every --poll-interval)")
+    parser.add_argument('--poll-interval', type=float, default=0.05)
+    parser.add_argument('--json', action='store_true', help="print the results as JSON")
+    args = parser.parse_args()
+    if args.job_workers is None:
+        args.job_workers = args.http_workers or 4
+
+    if not args.url:
+        configure_stubs(args)
+    transport = make_transport(args.url, args.http_workers)
+
+    modes = ['sync', 'job'] if args.mode == 'compare' else [args.mode]
+    runs = []
+    for mode in modes:
+        send = make_sender(transport, mode, args.poll_wait, args.poll_interval)
+        results = {'mode': mode, 'backend': 'remote' if args.url else args.backend}
+        results.update(run_benchmark(send, args.requests, args.concurrency))
+        runs.append(results)
+
+    if args.json:
+        print(json.dumps(runs))
+    else:
+        print_results(runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -26,9 +26,72 @@ class Config:
     DEFAULT_NEWS_CATEGORY = 'general'
     
     # NLP Configuration
-    SPACY_MODEL = 'en_core_web_sm'
+    SPACY_MODEL = os.getenv('SPACY_MODEL', 'en_core_web_sm')
     TFIDF_MAX_FEATURES = 1000
     
+    # Only NER is used for entity extraction, so the other pipeline
+    # components are excluded to keep their weights out of each worker
+    SPACY_TRIM_PIPELINE = os.getenv('SPACY_TRIM_PIPELINE', 'True').lower() == 'true'
+    
+    # Provider Configuration
+    # 'live' calls the real APIs; 'stub' and 'http-stub' use local stand-ins
+    PROVIDER_BACKEND = os.getenv('PROVIDER_BACKEND', 'live')
+    PROVIDER_TIMEOUTS = {
+        'weather': float(os.getenv('WEATHER_TIMEOUT', '10')),
+        'news': float(os.getenv('NEWS_TIMEOUT', '10')),
+        'search': float(os.getenv('SEARCH_TIMEOUT', '10')),
+    }
+    PROVIDER_MAX_CONCURRENCY = {
+        'weather': int(os.getenv('WEATHER_MAX_CONCURRENCY', '4')),
+        'news': int(os.getenv('NEWS_MAX_CONCURRENCY', '4')),
+        'search': int(os.getenv('SEARCH_MAX_CONCURRENCY', '4')),
+    }
+    
+    # Stub Provider Configuration
+    STUB_LATENCY_MS = float(os.getenv('STUB_LATENCY_MS', '50'))
+    STUB_JITTER_MS = float(os.getenv('STUB_JITTER_MS', '0'))
+    STUB_LATENCY_DISTRIBUTION = os.getenv('STUB_LATENCY_DISTRIBUTION', 'fixed')
+    STUB_ERROR_RATE = float(os.getenv('STUB_ERROR_RATE', '0'))
+    STUB_SEED = int(os.getenv('STUB_SEED', '0'))
+    STUB_HTTP_URL = os.getenv('STUB_HTTP_URL', '')
+    
+    # Job Queue Configuration
+    # Intents that /chat?async=1 hands to the job queue instead of answering inline
+    ASYNC_INTENTS = ['weather', 'news', 'search']
+    JOB_DB_PATH = os.getenv('JOB_DB_PATH', 'jobs.db')
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', '4'))
+    JOB_QUEUE_MAX = int(os.getenv('JOB_QUEUE_MAX', '1000'))
+    JOB_TTL_SECONDS = int(os.getenv('JOB_TTL_SECONDS', '3600'))
+    # Running jobs not finished within the lease are handed to another worker
+    JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', '300'))
+    JOB_POLL_MAX_WAIT = float(os.getenv('JOB_POLL_MAX_WAIT', '30'))
+    JOB_WEBHOOKS_ENABLED = os.getenv('JOB_WEBHOOKS_ENABLED', 'False').lower() == 'true'
+    JOB_WEBHOOK_TIMEOUT = float(os.getenv('JOB_WEBHOOK_TIMEOUT', '5'))
+    # Comma-separated hosts callback_url may point to; when empty, any public host
+    JOB_WEBHOOK_ALLOWED_HOSTS = [
+        host.strip().lower() for host in os.getenv('JOB_WEBHOOK_ALLOWED_HOSTS', '').split(',') if host.strip()
+    ]
+    
+    # Memory Configuration
+    WORKER_RSS_BUDGET_MB = int(os.getenv('WORKER_RSS_BUDGET_MB', '400'))
+    MEMORY_REPORT_REQUESTS = int(os.getenv('MEMORY_REPORT_REQUESTS', '100'))
+    
+    @classmethod
+    def stub_latency_settings(cls, kind):
+        """Return the stub latency settings for a provider kind
+        
+        Per-kind environment variables (e.g. STUB_SEARCH_LATENCY_MS) override
+        the global STUB_* values.
+        """
+        prefix = f'STUB_{kind.upper()}_'
+        return {
+            'latency_ms': float(os.getenv(prefix + 'LATENCY_MS', cls.STUB_LATENCY_MS)),
+            'jitter_ms': float(os.getenv(prefix + 'JITTER_MS', cls.STUB_JITTER_MS)),
+            'distribution': os.getenv(prefix + 'LATENCY_DISTRIBUTION', cls.STUB_LATENCY_DISTRIBUTION),
+            'error_rate': float(os.getenv(prefix + 'ERROR_RATE', cls.STUB_ERROR_RATE)),
+            'seed': cls.STUB_SEED,
+        }
+    
     @classmethod
     def validate_api_keys(cls):
         """Validate that required API keys are set"""
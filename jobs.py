@@ -0,0 +1,321 @@
+"""
+Persistent job queue for slow chatbot intents
+Jobs are stored in a local SQLite database and executed by a bounded pool
+of worker threads. Results are fetched by (long-)polling, and optionally
+delivered to a webhook when a job finishes.
+
+Several processes may share one database. A running job belongs to the
+worker that claimed it; if it is not finished within the lease it is
+assumed lost (e.g. the process died) and handed to another worker.
+"""
+
+import ipaddress
+import logging
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+FAILED_RESPONSE = 'Sorry, something went wrong. Please try again.'
+
+
+class QueueFull(Exception):
+    """Raised when the queue already holds the maximum number of pending jobs"""
+
+
+class InvalidCallbackUrl(ValueError):
+    """Raised when a webhook URL is not allowed"""
+
+
+def validate_callback_url(url, allowed_hosts=()):
+    """Check that a webhook URL is safe for the server to POST to
+
+    With allowed_hosts, only those hosts are accepted. Otherwise any http(s)
+    host is accepted as long as none of its addresses is private, loopback,
+    link-local or otherwise not globally routable.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+        raise InvalidCallbackUrl("callback_url must be an http(s) URL")
+    try:
+        port = parsed.port
+    except ValueError:
+        raise InvalidCallbackUrl("callback_url has an invalid port")
+
+    host = parsed.hostname.lower()
+    if allowed_hosts:
+        if host not in allowed_hosts:
+            raise InvalidCallbackUrl(f"callback host '{host}' is not allowed")
+        return
+
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, port or 443)}
+    except (socket.gaierror, UnicodeError):
+        raise InvalidCallbackUrl(f"callback host '{host}' does not resolve")
+    for address in addresses:
+        if not ipaddress.ip_address(address.split('%')[0]).is_global:
+            raise InvalidCallbackUrl(f"callback host '{host}' resolves to a non-public address")
+
+
+class JobQueue:
+    """SQLite-backed job queue with a bounded worker pool
+
+    handler(intent, message) is called on a worker thread and must return the
+    response text. Workers start on the first start(), submit() or get().
+    """
+
+    def __init__(self, db_path, handler, workers=4, max_queued=1000, ttl_seconds=3600,
+                 lease_seconds=300, poll_interval=0.25, busy_timeout=30.0,
+                 webhook_timeout=5.0, webhooks_enabled=False, webhook_allowed_hosts=()):
+        self.db_path = db_path
+        self.handler = handler
+        self.workers = workers
+        self.max_queued = max_queued
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.busy_timeout = busy_timeout
+        self.webhook_timeout = webhook_timeout
+        self.webhooks_enabled = webhooks_enabled
+        self.webhook_allowed_hosts = {host.lower() for host in webhook_allowed_hosts}
+
+        self._lock = threading.Lock()
+        self._changed = threading.Condition()
+        self._threads = []
+        self._stopping = threading.Event()
+        self._conn = None
+        self._webhooks = None
+        self._next_reclaim = 0.0
+
+    def _db(self):
+        """Return the database connection, creating it on first use (call with _lock held)"""
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout,
+                                   check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                ' id TEXT PRIMARY KEY,'
+                ' intent TEXT NOT NULL,'
+                ' message TEXT NOT NULL,'
+                ' callback_url TEXT,'
+                ' status TEXT NOT NULL,'
+                ' owner TEXT,'
+                ' response TEXT,'
+                ' created_at REAL NOT NULL,'
+                ' updated_at REAL NOT NULL)'
+            )
+            columns = {row['name'] for row in conn.execute('PRAGMA table_info(jobs)')}
+            if 'owner' not in columns:
+                conn.execute('ALTER TABLE jobs ADD COLUMN owner TEXT')
+            conn.execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)')
+            self._conn = conn
+        return self._conn
+
+    def start(self):
+        """Start the worker threads (and the webhook sender) if not already running"""
+        with self._lock:
+            if self._threads:
+                return
+            if self.webhooks_enabled:
+                self._webhooks = ThreadPoolExecutor(max_workers=2, thread_name_prefix='job-webhook')
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'job-worker-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self):
+        """Stop the worker threads once their current jobs finish"""
+        self._stopping.set()
+        with self._changed:
+            self._changed.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self._webhooks is not None:
+            self._webhooks.shutdown(wait=False)
+            self._webhooks = None
+        self._stopping.clear()
+
+    def submit(self, intent, message, callback_url=None):
+        """Queue a job and return its ID
+
+        callback_url is ignored unless webhooks are enabled, and raises
+        InvalidCallbackUrl if it fails validate_callback_url().
+        """
+        if not self.webhooks_enabled:
+            callback_url = None
+        elif callback_url:
+            validate_callback_url(callback_url, self.webhook_allowed_hosts)
+        self.start()
+        now = time.time()
+        job_id = uuid.uuid4().hex
+
+        with self._lock:
+            db = self._db()
+            db.execute(
+                'DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?',
+                (DONE, FAILED, now - self.ttl_seconds)
+            )
+            queued = db.execute(
+                'SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)', (QUEUED, RUNNING)
+            ).fetchone()[0]
+            if queued >= self.max_queued:
+                raise QueueFull(f"{queued} jobs pending")
+            db.execute(
+                'INSERT INTO jobs (id, intent, message, callback_url, status, created_at, updated_at)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (job_id, intent, message, callback_url, QUEUED, now, now)
+            )
+
+        with self._changed:
+            self._changed.notify_all()
+        return job_id
+
+    def get(self, job_id, wait=0):
+        """Return a job as a dict, waiting up to wait seconds for it to finish
+
+        Returns None for unknown job IDs. Finished jobs written by another
+        process are picked up by re-reading the database every poll_interval.
+        """
+        self.start()
+        deadline = time.time() + wait
+        while True:
+            job = self._read(job_id)
+            remaining = deadline - time.time()
+            if job is None or job['status'] in (DONE, FAILED) or remaining <= 0:
+                return job
+            with self._changed:
+                self._changed.wait(min(remaining, self.poll_interval))
+
+    def _read(self, job_id):
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                'SELECT id, status, response FROM jobs WHERE id = ?', (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = {'job_id': row['id'], 'status': row['status']}
+        if row['status'] in (DONE, FAILED):
+            job['response'] = row['response']
+        return job
+
+    def _claim(self, owner):
+        """Atomically mark the oldest queued job as running under owner and return it
+
+        Running jobs whose lease has expired are put back in the queue first;
+        that check runs a few times per lease rather than on every claim.
+        Returns None when there is nothing to do or another process holds
+        the write lock, so idle workers neither write nor wait on SQLite.
+        """
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            reclaim = now >= self._next_reclaim
+            expired_before = now - self.lease_seconds if reclaim else 0
+            pending = db.execute(
+                'SELECT 1 FROM jobs WHERE status = ? OR (status = ? AND updated_at < ?) LIMIT 1',
+                (QUEUED, RUNNING, expired_before)
+            ).fetchone()
+            if pending is None:
+                if reclaim:
+                    self._next_reclaim = now + self.lease_seconds / 4
+                return None
+
+            # Don't sit in SQLite's busy handler while holding _lock
+            db.execute(f'PRAGMA busy_timeout = {int(self.poll_interval * 1000)}')
+            try:
+                db.execute('BEGIN IMMEDIATE')
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e):
+                    raise
+                return None
+            finally:
+                db.execute(f'PRAGMA busy_timeout = {int(self.busy_timeout * 1000)}')
+            try:
+                if reclaim:
+                    db.execute(
+                        'UPDATE jobs SET status = ?, owner = NULL, updated_at = ?'
+                        ' WHERE status = ? AND updated_at < ?',
+                        (QUEUED, now, RUNNING, expired_before)
+                    )
+                    self._next_reclaim = now + self.lease_seconds / 4
+                row = db.execute(
+                    'SELECT id, intent, message, callback_url FROM jobs'
+                    ' WHERE status = ? ORDER BY created_at LIMIT 1', (QUEUED,)
+                ).fetchone()
+                if row is not None:
+                    db.execute(
+                        'UPDATE jobs SET status = ?, owner = ?, updated_at = ? WHERE id = ?',
+                        (RUNNING, owner, now, row['id'])
+                    )
+                db.execute('COMMIT')
+            except Exception:
+                db.execute('ROLLBACK')
+                raise
+        return row
+
+    def _finish(self, job_id, owner, status, response):
+        """Store a job's result; returns False if the job was handed to another worker"""
+        with self._lock:
+            db = self._db()
+            updated = db.execute(
+                'UPDATE jobs SET status = ?, response = ?, updated_at = ? WHERE id = ? AND owner = ?',
+                (status, response, time.time(), job_id, owner)
+            ).rowcount
+        with self._changed:
+            self._changed.notify_all()
+        return updated == 1
+
+    def _work(self):
+        while not self._stopping.is_set():
+            owner = uuid.uuid4().hex
+            try:
+                row = self._claim(owner)
+            except sqlite3.Error:
+                logger.exception("Could not claim a job")
+                row = None
+            if row is None:
+                with self._changed:
+                    self._changed.wait(self.poll_interval)
+                continue
+
+            try:
+                status, response = DONE, self.handler(row['intent'], row['message'])
+            except Exception:
+                logger.exception("Job %s failed", row['id'])
+                status, response = FAILED, FAILED_RESPONSE
+
+            try:
+                finished = self._finish(row['id'], owner, status, response)
+            except sqlite3.Error:
+                # The lease expires and another worker retries the job
+                logger.exception("Could not store the result of job %s", row['id'])
+                continue
+
+            if finished and row['callback_url'] and self._webhooks is not None:
+                payload = {'job_id': row['id'], 'status': status, 'response': response}
+                self._webhooks.submit(self._deliver, row['callback_url'], payload)
+
+    def _deliver(self, callback_url, payload):
+        """POST a finished job to its webhook; delivery is best effort"""
+        try:
+            # Re-check at delivery time in case the host now resolves elsewhere
+            validate_callback_url(callback_url, self.webhook_allowed_hosts)
+            requests.post(callback_url, json=payload, timeout=self.webhook_timeout, allow_redirects=False)
+        except (InvalidCallbackUrl, requests.RequestException):
+            logger.warning("Webhook delivery to %s failed", callback_url, exc_info=True)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Memory report for a single chatbot worker
+Takes tracemalloc snapshots as each component is loaded and records the
+process RSS at startup and after serving a number of /chat requests.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import sys
+import tracemalloc
+
+# Third-party imports measured in load order, before the app module itself
+COMPONENT_IMPORTS = [
+    ('flask', 'flask'),
+    ('requests', 'requests'),
+    ('sklearn', 'sklearn.feature_extraction.text'),
+    ('spacy', 'spacy'),
+    ('wikipedia', 'wikipedia'),
+    ('newsapi', 'newsapi'),
+]
+
+# Offline messages used to exercise the /chat route without external APIs
+SAMPLE_MESSAGES = [
+    "hello",
+    "tell me a joke",
+    "what can you do",
+    "weather today",
+    "goodbye",
+]
+
+def get_rss_bytes():
+    """Return the current resident set size of this process in bytes"""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # Not on Linux: fall back to the peak RSS reported by getrusage
+        import resource
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+def to_mb(num_bytes):
+    """Convert bytes to megabytes rounded for display"""
+    return round(num_bytes / (1024 * 1024), 2)
+
+def snapshot_diff(before, after):
+    """Return the net traced allocation growth between two snapshots"""
+    return sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+
+def run_report(num_requests, trace=True):
+    """Load every component and return the memory report
+
+    With trace=False no tracemalloc snapshots are taken. Tracing keeps a
+    traceback per allocation, which inflates RSS, so budget checks use
+    untraced runs.
+    """
+    report = {
+        'rss_startup_mb': to_mb(get_rss_bytes()),
+        'components': [],
+    }
+    previous = None
+
+    def record(component):
+        nonlocal previous
+        if not trace:
+            return
+        current = tracemalloc.take_snapshot()
+        report['components'].append({
+            'component': component,
+            'traced_mb': to_mb(snapshot_diff(previous, current)),
+        })
+        previous = current
+
+    if trace:
+        tracemalloc.start()
+        previous = tracemalloc.take_snapshot()
+
+    for name, module in COMPONENT_IMPORTS:
+        importlib.import_module(module)
+        record(f'import {name}')
+
+    # Importing the app loads the spaCy pipeline and trains the TF-IDF model
+    app_module = importlib.import_module('app')
+    record('app (spaCy pipeline + TF-IDF model)')
+    report['spacy_pipeline'] = app_module.nlp.pipe_names if app_module.nlp else []
+    report['rss_loaded_mb'] = to_mb(get_rss_bytes())
+
+    client = app_module.app.test_client()
+    for i in range(num_requests):
+        message = SAMPLE_MESSAGES[i % len(SAMPLE_MESSAGES)]
+        client.post('/chat', json={'message': message})
+    record(f'{num_requests} /chat requests')
+
+    if trace:
+        tracemalloc.stop()
+    report['requests'] = num_requests
+    report['rss_after_requests_mb'] = to_mb(get_rss_bytes())
+    return report
+
+def print_report(report):
+    """Print the memory report in a readable table"""
+    print("=" * 60)
+    print("🧠 Worker Memory Report")
+    print("=" * 60)
+    print(f"RSS at startup:        {report['rss_startup_mb']:>8} MB")
+    print(f"RSS after loading:     {report['rss_loaded_mb']:>8} MB")
+    print(f"RSS after {report['requests']} requests: {report['rss_after_requests_mb']:>8} MB")
+    print(f"spaCy pipeline:        {', '.join(report['spacy_pipeline']) or 'not loaded'}")
+    if not report['components']:
+        return
+    print("\nTraced allocations per component:")
+    for component in report['components']:
+        print(f"  {component['component']:<40} {component['traced_mb']:>8} MB")
+
+def main():
+    """Main memory report function"""
+    parser = argparse.ArgumentParser(description="Report per-worker memory usage of the chatbot")
+    parser.add_argument('--requests', type=int, default=None,
+                        help="number of /chat requests to serve before the final RSS reading")
+    parser.add_argument('--no-trace', action='store_true',
+                        help="skip tracemalloc so RSS readings are not inflated by tracing")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    args = parser.parse_args()
+
+    from config import Config
+    num_requests = args.requests if args.requests is not None else Config.MEMORY_REPORT_REQUESTS
+
+    report = run_report(num_requests, trace=not args.no_trace)
+    if args.json:
+        print(json.dumps(report))
+    else:
+        print_report(report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+External data providers for the Enhanced AI Chatbot
+Each provider wraps one upstream service behind a common interface with
+its own timeout and concurrency limit, so backends can be swapped for
+local stubs without touching the chatbot.
+"""
+
+import math
+import os
+import threading
+import time
+
+import requests
+import wikipedia
+from newsapi import NewsApiClient
+
+from config import Config
+
+
+class ProviderError(Exception):
+    """Raised when a provider cannot return a result"""
+
+
+class ProviderNotConfigured(ProviderError):
+    """Raised when a provider is missing its API key or is not registered"""
+
+
+class ProviderNotFound(ProviderError):
+    """Raised when the upstream has no result for the query"""
+
+
+class AmbiguousQuery(ProviderError):
+    """Raised when the query matches several results"""
+
+
+class ProviderTimeout(ProviderError):
+    """Raised when a provider does not answer within its timeout"""
+
+
+class ProviderBusy(ProviderError):
+    """Raised when all of a provider's concurrency slots stay taken for the whole timeout"""
+
+
+# Deadline of the Provider.call() running on the current thread
+_call_deadline = threading.local()
+
+
+def call_time_left():
+    """Return the seconds left before the current provider call's deadline (inf outside a call)"""
+    deadline = getattr(_call_deadline, 'value', None)
+    return math.inf if deadline is None else deadline - time.monotonic()
+
+
+class TimeoutSession(requests.Session):
+    """requests session that caps the timeout of every request it sends
+
+    Inside Provider.call() each request is also limited to the time left
+    before the call's deadline, so several requests share one budget.
+    """
+
+    def __init__(self, timeout):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        timeout = min(kwargs.get('timeout') or self.timeout, self.timeout, call_time_left())
+        if timeout <= 0:
+            raise requests.Timeout(f"No time left to request {url}")
+        kwargs['timeout'] = timeout
+        return super().request(method, url, **kwargs)
+
+
+class Provider:
+    """Base class for external data providers
+
+    Subclasses implement fetch() and must bound every upstream call by
+    time_left() (e.g. through a TimeoutSession). Calls go through call(),
+    which allows at most max_concurrency fetches at once. Each call has one
+    deadline, timeout seconds after it starts, covering both the wait for a
+    slot (ProviderBusy) and every upstream request (ProviderTimeout).
+    """
+
+    name = 'provider'
+    source = 'Unknown'
+
+    def __init__(self, timeout=10.0, max_concurrency=4):
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._session = None
+
+    def fetch(self, **kwargs):
+        """Fetch a result from the upstream service"""
+        raise NotImplementedError
+
+    def call(self, **kwargs):
+        """Fetch a result, enforcing the concurrency limit and timeout"""
+        deadline = time.monotonic() + self.timeout
+        if not self._slots.acquire(timeout=self.timeout):
+            raise ProviderBusy(f"{self.name} has {self.max_concurrency} calls in flight")
+        _call_deadline.value = deadline
+        try:
+            return self.fetch(**kwargs)
+        except ProviderError:
+            raise
+        except requests.Timeout as e:
+            raise ProviderTimeout(f"{self.name} did not respond within {self.timeout}s") from e
+        except Exception as e:
+            raise ProviderError(f"{self.name} failed: {e}") from e
+        finally:
+            _call_deadline.value = None
+            self._slots.release()
+
+    def time_left(self):
+        """Return the seconds a fetch may still spend upstream"""
+        return min(self.timeout, call_time_left())
+
+    def close(self):
+        """Release any resources held by the provider"""
+        if self._session is not None:
+            self._session.close()
+
+
+class OpenWeatherMapProvider(Provider):
+    """Current weather from the OpenWeatherMap API"""
+
+    name = 'weather'
+    source = 'OpenWeatherMap'
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._session = TimeoutSession(self.timeout)
+
+    def fetch(self, city):
+        api_key = os.getenv('OPENWEATHER_API_KEY')
+        if not api_key:
+            raise ProviderNotConfigured("OPENWEATHER_API_KEY is not set")
+
+        response = self._session.get(
+            'https://api.openweathermap.org/data/2.5/weather',
+            params={'q': city, 'appid': api_key, 'units': 'metric'}
+        )
+        if response.status_code == 404:
+            raise ProviderNotFound(f"No weather data for '{city}'")
+        response.raise_for_status()
+        data = response.json()
+
+        return {
+            'city_name': data['name'],
+            'description': data['weather'][0]['description'],
+            'temp': data['main']['temp'],
+            'feels_like': data['main']['feels_like'],
+            'humidity': data['main']['humidity'],
+            'wind_speed': data['wind']['speed'],
+        }
+
+
+class NewsApiProvider(Provider):
+    """Top headlines from NewsAPI"""
+
+    name = 'news'
+    source = 'NewsAPI'
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._session = TimeoutSession(self.timeout)
+
+    def fetch(self, category='general', country='us'):
+        api_key = os.getenv('NEWS_API_KEY')
+        if not api_key:
+            raise ProviderNotConfigured("NEWS_API_KEY is not set")
+
+        newsapi = NewsApiClient(api_key=api_key, session=self._session)
+        top_headlines = newsapi.get_top_headlines(category=category, country=country, page_size=5)
+
+        return [
+            {'title': article['title'], 'source': article['source']['name']}
+            for article in top_headlines['articles']
+        ]
+
+
+# The wikipedia package's own requests module, restored when the patch is removed
+_wikipedia_requests = wikipedia.wikipedia.requests
+
+
+class WikipediaProvider(Provider):
+    """Topic summaries from Wikipedia"""
+
+    name = 'search'
+    source = 'Wikipedia'
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # The wikipedia package calls the module-level requests.get without a
+        # timeout; route its requests through a session that sets one. The
+        # newest instance owns the patch until it is closed.
+        self._session = TimeoutSession(self.timeout)
+        wikipedia.wikipedia.requests = self._session
+
+    def close(self):
+        if wikipedia.wikipedia.requests is self._session:
+            wikipedia.wikipedia.requests = _wikipedia_requests
+        super().close()
+
+    def fetch(self, query):
+        search_results = wikipedia.search(query, results=3)
+        if not search_results:
+            raise ProviderNotFound(f"No Wikipedia results for '{query}'")
+
+        try:
+            return wikipedia.summary(search_results[0], sentences=3)
+        except wikipedia.exceptions.DisambiguationError as e:
+            raise AmbiguousQuery(str(e)) from e
+        except wikipedia.exceptions.PageError as e:
+            raise ProviderNotFound(str(e)) from e
+
+
+# Registered provider instances, keyed by kind ('weather', 'news', 'search')
+_providers = {}
+
+LIVE_PROVIDERS = {
+    'weather': OpenWeatherMapProvider,
+    'news': NewsApiProvider,
+    'search': WikipediaProvider,
+}
+
+
+def register_provider(kind, provider):
+    """Register a provider for a kind, replacing any existing one"""
+    previous = _providers.get(kind)
+    _providers[kind] = provider
+    if previous is not None and previous is not provider:
+        previous.close()
+
+
+def get_provider(kind):
+    """Return the registered provider for a kind"""
+    try:
+        return _providers[kind]
+    except KeyError:
+        raise ProviderNotConfigured(f"No provider registered for '{kind}'")
+
+
+def registered_providers():
+    """Return a copy of the registered providers"""
+    return dict(_providers)
+
+
+def provider_options(kind):
+    """Return the configured timeout and concurrency limit for a kind"""
+    return {
+        'timeout': Config.PROVIDER_TIMEOUTS[kind],
+        'max_concurrency': Config.PROVIDER_MAX_CONCURRENCY[kind],
+    }
+
+
+def load_backend(backend=None):
+    """Register the providers of a backend ('live', 'stub' or 'http-stub')"""
+    backend = backend or Config.PROVIDER_BACKEND
+
+    if backend == 'live':
+        new_providers = {
+            kind: provider_class(**provider_options(kind))
+            for kind, provider_class in LIVE_PROVIDERS.items()
+        }
+    elif backend in ('stub', 'http-stub'):
+        import stub_providers
+        new_providers = stub_providers.build_providers(http=backend == 'http-stub')
+    else:
+        raise ValueError(f"Unknown provider backend '{backend}'")
+
+    for kind, provider in new_providers.items():
+        register_provider(kind, provider)
+    return new_providers
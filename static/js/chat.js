@@ -10,6 +10,12 @@ class ChatbotInterface {
         this.isTyping = false;
         this.messageCount = 0;
         
+        // Slow intents (weather, news, search) run as background jobs
+        this.useAsyncJobs = true;
+        this.jobPollWait = 25;
+        this.jobDeadlineMs = 120000;
+        this.jobPollRetries = 3;
+        
         this.initializeEventListeners();
         this.setWelcomeTime();
     }
@@ -172,7 +178,8 @@ class ChatbotInterface {
     }
     
     async sendMessageToBackend(message) {
-        const response = await fetch('/chat', {
+        const url = this.useAsyncJobs ? '/chat?async=1' : '/chat';
+        const response = await fetch(url, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -180,14 +187,55 @@ class ChatbotInterface {
             body: JSON.stringify({ message: message })
         });
         
-        if (!response.ok) {
+        // 503 means the job queue is full; the body still carries a message
+        if (!response.ok && response.status !== 503) {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
         
         const data = await response.json();
+        if (data.job_id) {
+            return this.waitForJob(data.job_id);
+        }
         return data.response;
     }
     
+    async waitForJob(jobId) {
+        // Long-poll until the job finishes; the server holds each request for up to jobPollWait seconds.
+        // Give up after jobDeadlineMs in total or after jobPollRetries failed polls in a row.
+        const deadline = Date.now() + this.jobDeadlineMs;
+        let failures = 0;
+        
+        while (Date.now() < deadline) {
+            const remaining = Math.max(1, Math.floor((deadline - Date.now()) / 1000));
+            const wait = Math.min(this.jobPollWait, remaining);
+            
+            try {
+                const response = await fetch(`/jobs/${encodeURIComponent(jobId)}?wait=${wait}`);
+                
+                if (response.status === 404) {
+                    throw new Error('Job not found');
+                }
+                if (!response.ok) {
+                    throw new Error(`HTTP error! status: ${response.status}`);
+                }
+                
+                const job = await response.json();
+                if (job.status === 'done' || job.status === 'failed') {
+                    return job.response;
+                }
+                failures = 0;
+            } catch (error) {
+                failures += 1;
+                if (failures >= this.jobPollRetries || error.message === 'Job not found') {
+                    throw error;
+                }
+                await new Promise(resolve => setTimeout(resolve, 1000 * failures));
+            }
+        }
+        
+        throw new Error('Timed out waiting for the response');
+    }
+    
     // Function to handle suggestion button clicks
     sendSuggestion(suggestion) {
         this.userInput.value = suggestion;
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Local stub providers for offline and reproducible performance testing
+Stubs return canned data after a configurable latency and fail at a
+configurable error rate. They run either in-process or behind a local
+HTTP server, so the full /chat path can be exercised without network.
+
+Run a standalone HTTP stub server with:
+    python stub_providers.py --port 8090 --latency-ms 200 --error-rate 0.05
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from config import Config
+from providers import (
+    Provider, ProviderError, ProviderNotFound, ProviderTimeout, TimeoutSession, provider_options
+)
+
+DISTRIBUTIONS = ('fixed', 'uniform', 'normal', 'exponential')
+
+
+class LatencyModel:
+    """Seeded latency and error distribution for a stub
+
+    fixed: always latency_ms
+    uniform: latency_ms +/- jitter_ms
+    normal: mean latency_ms, standard deviation jitter_ms
+    exponential: mean latency_ms
+    """
+
+    def __init__(self, latency_ms=50, jitter_ms=0, distribution='fixed', error_rate=0.0, seed=0):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution '{distribution}'")
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.distribution = distribution
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, kind):
+        """Build the latency model configured for a provider kind"""
+        return cls(**Config.stub_latency_settings(kind))
+
+    def sample(self):
+        """Return (delay in seconds, whether to fail) for one call"""
+        with self._lock:
+            if self.distribution == 'uniform':
+                delay_ms = self._random.uniform(self.latency_ms - self.jitter_ms, self.latency_ms + self.jitter_ms)
+            elif self.distribution == 'normal':
+                delay_ms = self._random.gauss(self.latency_ms, self.jitter_ms)
+            elif self.distribution == 'exponential':
+                delay_ms = self._random.expovariate(1.0 / self.latency_ms) if self.latency_ms > 0 else 0
+            else:
+                delay_ms = self.latency_ms
+            fail = self._random.random() < self.error_rate
+        return max(delay_ms, 0) / 1000.0, fail
+
+    def wait(self):
+        """Sleep for one sampled delay and return whether the call should fail"""
+        delay, fail = self.sample()
+        time.sleep(delay)
+        return fail
+
+
+def stub_weather(city):
+    """Return deterministic weather data for a city"""
+    seed = zlib.crc32(city.lower().encode())
+    return {
+        'city_name': city.title(),
+        'description': ['clear sky', 'few clouds', 'light rain', 'overcast clouds'][seed % 4],
+        'temp': round(-5 + (seed % 400) / 10, 1),
+        'feels_like': round(-7 + (seed % 400) / 10, 1),
+        'humidity': 30 + seed % 60,
+        'wind_speed': round((seed % 150) / 10, 1),
+    }
+
+
+def stub_news(category='general', country='us'):
+    """Return a fixed set of headlines"""
+    return [
+        {'title': f"Stub {category} headline {i} ({country.upper()})", 'source': 'Stub News'}
+        for i in range(1, 6)
+    ]
+
+
+def stub_search(query):
+    """Return a fixed summary for a query"""
+    if query.lower() == 'nothing':
+        raise ProviderNotFound(f"No stub results for '{query}'")
+    return (
+        f"{query.title()} is a topic served by the local stub provider. "
+        f"This summary stands in for a Wikipedia article about {query}. "
+        "It has a fixed length so responses are comparable between runs."
+    )
+
+
+STUB_RESPONSES = {
+    'weather': stub_weather,
+    'news': stub_news,
+    'search': stub_search,
+}
+
+
+class StubProvider(Provider):
+    """In-process stub that answers from STUB_RESPONSES after a sampled delay"""
+
+    source = 'Local stub'
+
+    def __init__(self, kind, latency=None, **kwargs):
+        self.name = kind
+        self.latency = latency or LatencyModel.from_config(kind)
+        super().__init__(**kwargs)
+
+    def fetch(self, **kwargs):
+        # Behave like an upstream call with a socket timeout
+        delay, fail = self.latency.sample()
+        time_left = self.time_left()
+        if delay > time_left:
+            time.sleep(max(time_left, 0))
+            raise ProviderTimeout(f"{self.name} did not respond within {self.timeout}s")
+        time.sleep(delay)
+        if fail:
+            raise ProviderError(f"{self.name} stub injected error")
+        return STUB_RESPONSES[self.name](**kwargs)
+
+
+class HttpStubProvider(Provider):
+    """Provider that calls a local HTTP stub server"""
+
+    def __init__(self, kind, base_url, **kwargs):
+        self.name = kind
+        self.base_url = base_url.rstrip('/')
+        self.source = f'Local HTTP stub ({self.base_url})'
+        super().__init__(**kwargs)
+        self._session = TimeoutSession(self.timeout)
+
+    def fetch(self, **kwargs):
+        response = self._session.get(f'{self.base_url}/{self.name}', params=kwargs)
+        if response.status_code == 404:
+            raise ProviderNotFound(response.json().get('error', ''))
+        response.raise_for_status()
+        return response.json()['result']
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """Serve /weather, /news and /search from STUB_RESPONSES"""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        kind = url.path.strip('/')
+        if kind not in STUB_RESPONSES:
+            self._send_json(404, {'error': f"Unknown stub '{kind}'"})
+            return
+
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if self.server.latency_models[kind].wait():
+            self._send_json(500, {'error': f"{kind} stub injected error"})
+            return
+
+        try:
+            self._send_json(200, {'result': STUB_RESPONSES[kind](**params)})
+        except ProviderNotFound as e:
+            self._send_json(404, {'error': str(e)})
+        except TypeError as e:
+            self._send_json(400, {'error': str(e)})
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep benchmark output clean
+        pass
+
+
+def start_stub_server(host='127.0.0.1', port=0, latency_models=None):
+    """Start an HTTP stub server on a daemon thread and return it
+
+    Pass port=0 to pick a free port; the bound address is server.server_address.
+    """
+    server = ThreadingHTTPServer((host, port), StubRequestHandler)
+    server.daemon_threads = True
+    server.latency_models = latency_models or {
+        kind: LatencyModel.from_config(kind) for kind in STUB_RESPONSES
+    }
+    thread = threading.Thread(target=server.serve_forever, name='stub-http-server', daemon=True)
+    thread.start()
+    return server
+
+
+# Server started on demand for the 'http-stub' backend when STUB_HTTP_URL is unset
+_local_server = None
+
+
+def build_providers(http=False):
+    """Build stub providers for every kind, in-process or over local HTTP"""
+    global _local_server
+
+    if not http:
+        return {kind: StubProvider(kind, **provider_options(kind)) for kind in STUB_RESPONSES}
+
+    base_url = Config.STUB_HTTP_URL
+    if not base_url:
+        if _local_server is None:
+            _local_server = start_stub_server()
+        host, port = _local_server.server_address[:2]
+        base_url = f'http://{host}:{port}'
+    return {kind: HttpStubProvider(kind, base_url, **provider_options(kind)) for kind in STUB_RESPONSES}
+
+
+def main():
+    """Run a standalone HTTP stub server"""
+    parser = argparse.ArgumentParser(description="Run the local HTTP stub provider server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency-ms', type=float, default=Config.STUB_LATENCY_MS)
+    parser.add_argument('--jitter-ms', type=float, default=Config.STUB_JITTER_MS)
+    parser.add_argument('--distribution', choices=DISTRIBUTIONS, default=Config.STUB_LATENCY_DISTRIBUTION)
+    parser.add_argument('--error-rate', type=float, default=Config.STUB_ERROR_RATE)
+    parser.add_argument('--seed', type=int, default=Config.STUB_SEED)
+    args = parser.parse_args()
+
+    latency_models = {
+        kind: LatencyModel(args.latency_ms, args.jitter_ms, args.distribution, args.error_rate, args.seed)
+        for kind in STUB_RESPONSES
+    }
+    server = start_stub_server(args.host, args.port, latency_models)
+    print(f"🧪 Stub provider server running on http://{args.host}:{args.port}")
+    print(f"   Set STUB_HTTP_URL=http://{args.host}:{args.port} and PROVIDER_BACKEND=http-stub")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
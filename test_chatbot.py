@@ -6,6 +6,10 @@ This script tests the chatbot functionality without requiring API keys.
 
 import sys
 import os
+import json
+import subprocess
+import threading
+import time
 
 def test_basic_functionality():
     """Test basic chatbot functionality"""
@@ -99,6 +103,221 @@ def test_api_integration():
         print(f"  ❌ API test failed: {e}")
         return False
 
+def test_stub_providers():
+    """Test the weather, news and search paths against the local stub providers"""
+    print("\n🧪 Testing stub providers...")
+    
+    from app import chatbot
+    from config import Config
+    import requests
+    import wikipedia
+    from providers import load_backend, ProviderBusy, ProviderTimeout, WikipediaProvider
+    from stub_providers import LatencyModel, StubProvider
+    
+    try:
+        for backend in ('stub', 'http-stub'):
+            load_backend(backend)
+            weather = chatbot.get_weather("London")
+            news = chatbot.get_news()
+            search = chatbot.search_wikipedia("Python")
+            print(f"  {backend}: {weather.splitlines()[0]} | {news.splitlines()[0]} | {search.splitlines()[0]}")
+            assert "Weather in London" in weather
+            assert "Latest Headlines" in news
+            assert "Information about Python" in search
+            assert "Source: Wikipedia" not in search
+        
+        # Timed-out calls must give their concurrency slot back
+        slow = StubProvider('search', LatencyModel(latency_ms=5000), timeout=0.1, max_concurrency=1)
+        for _ in range(2):
+            try:
+                slow.call(query='Python')
+                assert False, "slow stub call should time out"
+            except ProviderTimeout:
+                pass
+        slow.latency = LatencyModel(latency_ms=0)
+        assert "Python" in slow.call(query='Python')
+        
+        # A call that never gets a slot fails with ProviderBusy
+        slow._slots.acquire()
+        try:
+            slow.call(query='Python')
+            assert False, "call without a free slot should be busy"
+        except ProviderBusy:
+            pass
+        finally:
+            slow._slots.release()
+        
+        # Waiting for a slot uses up the same deadline as the fetch
+        shared = StubProvider('search', LatencyModel(latency_ms=300), timeout=0.5, max_concurrency=1)
+        holder = threading.Thread(target=shared.call, kwargs={'query': 'Python'})
+        holder.start()
+        time.sleep(0.05)
+        started = time.monotonic()
+        try:
+            shared.call(query='Python')
+            assert False, "call should run out of time after waiting for a slot"
+        except ProviderTimeout:
+            pass
+        holder.join()
+        assert time.monotonic() - started < 0.7
+        
+        # Closing the live search provider undoes its wikipedia patch
+        search_provider = WikipediaProvider(timeout=1)
+        assert wikipedia.wikipedia.requests is search_provider._session
+        search_provider.close()
+        assert wikipedia.wikipedia.requests is requests
+        print("  ✅ Stub providers working")
+        return True
+    finally:
+        load_backend(Config.PROVIDER_BACKEND)
+
+def test_job_mode():
+    """Test /chat?async=1 and /jobs/<id> against the stub providers"""
+    print("\n📬 Testing async job mode...")
+    
+    import app as app_module
+    from config import Config
+    from jobs import JobQueue
+    from providers import load_backend
+    
+    original_queue = app_module.job_queue
+    app_module.job_queue = JobQueue(':memory:', app_module.chatbot.respond, workers=2, webhooks_enabled=True)
+    load_backend('stub')
+    try:
+        client = app_module.app.test_client()
+        
+        reply = client.post('/chat?async=1', json={'message': 'latest news'})
+        assert reply.status_code == 202
+        job_id = reply.get_json()['job_id']
+        
+        job = client.get(f'/jobs/{job_id}?wait=5').get_json()
+        print(f"  'latest news' -> job {job['status']}: {job['response'].splitlines()[0]}")
+        assert job['status'] == 'done'
+        assert "Latest Headlines" in job['response']
+        
+        # Fast intents are still answered inline
+        reply = client.post('/chat?async=1', json={'message': 'hello'})
+        assert reply.status_code == 200 and 'response' in reply.get_json()
+        
+        assert client.get('/jobs/unknown').status_code == 404
+        
+        # Non-finite waits fall back to a plain poll instead of spinning
+        job_id = client.post('/chat?async=1', json={'message': 'latest news'}).get_json()['job_id']
+        assert client.get(f'/jobs/{job_id}?wait=nan').get_json()['status'] in ('queued', 'running', 'done')
+        
+        # Webhooks may not target private or loopback addresses
+        reply = client.post('/chat?async=1', json={'message': 'latest news', 'callback_url': 'http://127.0.0.1/hook'})
+        assert reply.status_code == 400
+        reply = client.post('/chat?async=1', json={'message': 'latest news', 'callback_url': 'http://example.com:abc/'})
+        assert reply.status_code == 400
+        
+        # A full queue turns new jobs away instead of growing without bound
+        app_module.job_queue.stop()
+        app_module.job_queue = JobQueue(':memory:', app_module.chatbot.respond, workers=0, max_queued=1)
+        assert client.post('/chat?async=1', json={'message': 'latest news'}).status_code == 202
+        assert client.post('/chat?async=1', json={'message': 'latest news'}).status_code == 503
+        print("  ✅ Job mode working")
+        return True
+    finally:
+        app_module.job_queue.stop()
+        app_module.job_queue = original_queue
+        load_backend(Config.PROVIDER_BACKEND)
+
+def test_job_queue():
+    """Test lease recovery, owner fencing and webhook delivery in the job queue"""
+    print("\n🗃️ Testing job queue...")
+    
+    from unittest import mock
+    from jobs import JobQueue, InvalidCallbackUrl, validate_callback_url, DONE, RUNNING
+    
+    # A job whose worker went away is handed to a new owner once its lease expires
+    queue = JobQueue(':memory:', lambda intent, message: message, workers=0, lease_seconds=60)
+    job_id = queue.submit('news', 'latest news')
+    assert queue._claim('stale')['id'] == job_id
+    with queue._lock:
+        queue._db().execute('UPDATE jobs SET updated_at = updated_at - 120 WHERE id = ?', (job_id,))
+    assert queue._claim('fresh') is None, "leases are only checked every lease_seconds / 4"
+    queue._next_reclaim = 0
+    assert queue._claim('fresh')['id'] == job_id
+    assert not queue._finish(job_id, 'stale', DONE, 'late result')
+    assert queue._finish(job_id, 'fresh', DONE, 'result')
+    assert queue.get(job_id) == {'job_id': job_id, 'status': DONE, 'response': 'result'}
+    
+    # An unexpired lease is left alone
+    job_id = queue.submit('news', 'latest news')
+    assert queue._claim('owner')['id'] == job_id
+    queue._next_reclaim = 0
+    assert queue._claim('other') is None
+    with queue._lock:
+        status = queue._db().execute('SELECT status FROM jobs WHERE id = ?', (job_id,)).fetchone()[0]
+    assert status == RUNNING
+    
+    # With an allow-list only the listed hosts are accepted, without a DNS lookup
+    allowed = {'hooks.example.com'}
+    validate_callback_url('https://hooks.example.com/done', allowed)
+    validate_callback_url('http://HOOKS.example.com:8080/done', allowed)
+    for url in ('https://other.example.com/done', 'https://example.com/done', 'ftp://hooks.example.com/done'):
+        try:
+            validate_callback_url(url, allowed)
+            assert False, f"{url} should be rejected"
+        except InvalidCallbackUrl:
+            pass
+    
+    # Finished jobs are POSTed to their webhook
+    queue = JobQueue(':memory:', lambda intent, message: f'{intent}: {message}', workers=1,
+                     webhooks_enabled=True, webhook_allowed_hosts=['hooks.example.com'], webhook_timeout=2)
+    try:
+        with mock.patch('jobs.requests.post') as post:
+            job_id = queue.submit('news', 'latest news', callback_url='https://hooks.example.com/done')
+            assert queue.get(job_id, wait=5)['status'] == DONE
+            deadline = time.monotonic() + 5
+            while not post.called and time.monotonic() < deadline:
+                time.sleep(0.01)
+            post.assert_called_once_with(
+                'https://hooks.example.com/done',
+                json={'job_id': job_id, 'status': DONE, 'response': 'news: latest news'},
+                timeout=2, allow_redirects=False
+            )
+    finally:
+        queue.stop()
+    print("  ✅ Job queue working")
+    return True
+
+def check_memory_budget():
+    """Run the memory report in a fresh worker process and compare RSS to the budget
+
+    Returns None when the spaCy model is not installed, since the report
+    then says nothing about the real pipeline.
+    """
+    print("\n🧠 Testing per-worker memory budget...")
+    from config import Config
+    
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'memory_report.py')
+    output = subprocess.check_output(
+        [sys.executable, script, '--requests', str(Config.MEMORY_REPORT_REQUESTS), '--no-trace', '--json'],
+        env=dict(os.environ, JOB_DB_PATH=':memory:'),
+        text=True
+    )
+    report = json.loads(output.strip().splitlines()[-1])
+    if not report['spacy_pipeline']:
+        print("  ⚠️ spaCy model not installed, skipping memory budget check")
+        return None
+    if Config.SPACY_TRIM_PIPELINE and report['spacy_pipeline'] != ['ner']:
+        print(f"  ❌ Expected a trimmed ['ner'] pipeline, got {report['spacy_pipeline']}")
+        return False
+    rss_mb = report['rss_after_requests_mb']
+    budget_mb = Config.WORKER_RSS_BUDGET_MB
+    print(f"  Worker RSS after {report['requests']} requests: {rss_mb} MB (budget {budget_mb} MB)")
+    return rss_mb <= budget_mb
+
+def test_memory_budget():
+    """Test that a single worker stays within the configured RSS budget"""
+    result = check_memory_budget()
+    if result is None:
+        import pytest
+        pytest.skip("spaCy model not installed")
+    assert result, "Worker pipeline is not trimmed or RSS exceeds WORKER_RSS_BUDGET_MB"
+
 def main():
     """Main test function"""
     print("=" * 50)
@@ -111,13 +330,45 @@ def main():
     # Test API integration
     api_success = test_api_integration()
     
+    # Test stub providers
+    try:
+        stub_success = test_stub_providers()
+    except Exception as e:
+        print(f"  ❌ Stub provider test failed: {e}")
+        stub_success = False
+    
+    # Test async job mode
+    try:
+        job_success = test_job_mode()
+    except Exception as e:
+        print(f"  ❌ Job mode test failed: {e}")
+        job_success = False
+    
+    # Test the job queue itself
+    try:
+        queue_success = test_job_queue()
+    except Exception as e:
+        print(f"  ❌ Job queue test failed: {e}")
+        queue_success = False
+    
+    # Test memory budget
+    try:
+        memory_success = check_memory_budget()
+    except Exception as e:
+        print(f"  ❌ Memory report failed: {e}")
+        memory_success = False
+    
     print("\n" + "=" * 50)
     print("📊 Test Results")
     print("=" * 50)
     print(f"Basic Functionality: {'✅ PASS' if basic_success else '❌ FAIL'}")
     print(f"API Integration: {'✅ PASS' if api_success else '⚠️  SKIP'}")
+    print(f"Stub Providers: {'✅ PASS' if stub_success else '❌ FAIL'}")
+    print(f"Job Mode: {'✅ PASS' if job_success else '❌ FAIL'}")
+    print(f"Job Queue: {'✅ PASS' if queue_success else '❌ FAIL'}")
+    print(f"Memory Budget: {'⚠️ SKIP' if memory_success is None else '✅ PASS' if memory_success else '❌ FAIL'}")
     
-    if basic_success:
+    if basic_success and stub_success and job_success and queue_success and memory_success is not False:
         print("\n🎉 Chatbot is working correctly!")
         print("You can now run: python app.py")
     else: